@@ -4,10 +4,11 @@ __all__ = [
     'StorageEngine',
     'SchemaManager',
     'IndexEngine',
-    'ExecutionEngine'
+    'ExecutionEngine',
+    'WhereNode'
 ]
 
 from core.storage_engine import StorageEngine
 from core.schema_manager import SchemaManager
 from core.index_engine import IndexEngine
-from core.execution_engine import ExecutionEngine
\ No newline at end of file
+from core.execution_engine import ExecutionEngine, WhereNode
\ No newline at end of file
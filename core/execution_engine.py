@@ -1,18 +1,63 @@
 #Execution Engine Module which implements core CRUD operations and relational algebra
 
+import operator
 from typing import Dict, List, Any, Optional, Callable
 from core.storage_engine import StorageEngine
 from core.schema_manager import SchemaManager
 from core.index_engine import IndexEngine
 
 
+# Comparison operators for WHERE conditions; they work elementwise on NumPy arrays too
+_COMPARISONS = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+}
+
+
+class WhereNode:
+    
+    # A parsed "column operator value" condition. It is callable like a plain predicate,
+    # but lets the engine see the condition's shape and answer it from an index.
+    __slots__ = ('column', 'op', 'value', 'fn')
+    
+    def __init__(
+        self, 
+        column: str, 
+        op: str, 
+        value: Any, 
+        fn: Callable[[Dict[str, Any]], bool]
+    ):
+        
+        self.column = column
+        self.op = op
+        self.value = value
+        self.fn = fn
+    
+    def __call__(self, row: Dict[str, Any]) -> bool:
+        
+        return self.fn(row)
+
+
 class ExecutionEngine:
     
+    # Below this many rows on the smaller side, building a hash table costs more than it saves
+    nested_loop_join_threshold = 8
+    
+    # Below this many rows a plain scan is cheaper than building a column array
+    vectorize_threshold = 1024
+    
     def __init__(self, storage: StorageEngine, schema: SchemaManager):
         
         self.storage = storage
         self.schema = schema
         self.index = IndexEngine()
+        
+        # storage.write_failures per table as of the last time the indexes were checked
+        self._write_failures: Dict[str, int] = {}
     
     def create_table(
         self, 
@@ -37,36 +82,54 @@ class ExecutionEngine:
             self.schema.drop_table_schema(table_name)
             raise e
     
+    def _check_writes(self, table_name: str) -> None:
+        
+        # After a failed background write the storage drops its cached rows, but the
+        # indexes still hold the rows that never reached the file. They are rebuilt from
+        # the file, and the failure is raised by the read if no one has reported it yet.
+        # The failure only counts as handled once the indexes are rebuilt, so a reload
+        # that fails is tried again by the next statement.
+        failures = self.storage.write_failures(table_name)
+        if failures == self._write_failures.get(table_name, 0):
+            return
+        
+        try:
+            self.storage.read_table(table_name)
+        finally:
+            self.index.drop_index(table_name)
+            self.load_table_index(table_name)
+            self._write_failures[table_name] = failures
+    
     def insert_row(self, table_name: str, row: Dict[str, Any]) -> None:
     
         table_schema = self.schema.get_table_schema(table_name)
+        self._check_writes(table_name)
         
         #Validate row data types and columns
         self.schema.validate_row(table_name, row)
         
-        #Load existing rows
-        rows = self.storage.read_table(table_name)
-        
         #Check primary key uniqueness
         primary_key = table_schema.get("primary_key")
         if primary_key:
             pk_value = row[primary_key]
             
+            # A missing index would make every key look free, so it is loaded first
+            if not self.index.has_index(table_name):
+                self.load_table_index(table_name)
+            
             # O(1) lookup via index becasuse index is O(1) and scan is O(n) so for 1M rows, index=0.001ms, scan=100ms
             if self.index.lookup(table_name, pk_value):
                 raise ValueError(
                     f"Primary key violation: '{pk_value}' already exists"
                 )
         
-        # Append row
-        rows.append(row)
-        
-        # Persist to disk
-        self.storage.write_table(table_name, rows)
+        # Persist to disk by appending only the new row
+        self.storage.append_row(table_name, row)
         
         # Update index
         if primary_key:
             self.index.insert(table_name, row, primary_key)
+        self.index.insert_secondary(table_name, row)
     
     def select_rows(
         self, 
@@ -75,20 +138,106 @@ class ExecutionEngine:
         columns: Optional[List[str]] = None
     ) -> List[Dict[str, Any]]:
         
-        rows = self.storage.read_table(table_name)
+        table_schema = self.schema.get_table_schema(table_name)
+        self._check_writes(table_name)
+        
+        # Equality on an indexed column is a single index probe instead of a full scan
+        rows = self._index_matches(table_name, table_schema, where)
         
-        # Filter rows
-        if where:
-            rows = [row for row in rows if where(row)]
+        if rows is None:
+            rows = self.storage.read_table(table_name)
+            
+            # Filter rows, with one vectorized comparison when the column is numeric
+            if where:
+                matches = self._vectorized_matches(table_name, table_schema, where, rows)
+                if matches is None:
+                    predicate = self._predicate(table_schema, where)
+                    matches = [row for row in rows if predicate(row)]
+                rows = matches
         
-        # Project columns
+        # Project columns. The row dicts are shared with the storage cache and the
+        # indexes, so callers always get copies they can modify without touching the table.
         if columns:
-            rows = [
+            return [
                 {col: row[col] for col in columns if col in row}
                 for row in rows
             ]
+        return [row.copy() for row in rows]
+    
+    def _predicate(
+        self, 
+        table_schema: Dict[str, Any], 
+        where: Callable[[Dict[str, Any]], bool]
+    ) -> Callable[[Dict[str, Any]], bool]:
+        
+        # Unwrap a WhereNode so scans call its compiled function directly
+        if isinstance(where, WhereNode):
+            if where.column not in table_schema["columns"]:
+                raise ValueError(f"Unknown column: {where.column}")
+            return where.fn
+        return where
+    
+    def _vectorized_matches(
+        self, 
+        table_name: str, 
+        table_schema: Dict[str, Any], 
+        where: Callable[[Dict[str, Any]], bool],
+        rows: List[Dict[str, Any]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        
+        # Evaluates "column op number" over a NumPy column array, or returns None so the
+        # caller falls back to a row scan
+        if not isinstance(where, WhereNode) or len(rows) < self.vectorize_threshold:
+            return None
+        
+        dtype = table_schema["columns"].get(where.column)
+        value_type = type(where.value)
+        # An Int column is only compared with ints so the result matches the scan exactly
+        if not (
+            (dtype == "Int" and value_type is int)
+            or (dtype == "Float" and value_type in (int, float))
+        ):
+            return None
+        
+        column = self.storage.column_array(table_name, where.column, dtype)
+        if column is None:
+            return None
+        
+        try:
+            mask = _COMPARISONS[where.op](column, where.value)
+        except OverflowError:
+            # The value is outside the array's integer range
+            return None
+        
+        indices = mask.nonzero()[0]
+        if len(indices) == 0:
+            return []
         
-        return rows
+        # Matches forming one contiguous run, as range filters on an ascending column
+        # do, are gathered with a single slice instead of one index at a time
+        first, last = int(indices[0]), int(indices[-1])
+        if last - first + 1 == len(indices):
+            return rows[first:last + 1]
+        
+        return [rows[i] for i in indices.tolist()]
+    
+    def _index_matches(
+        self, 
+        table_name: str, 
+        table_schema: Dict[str, Any], 
+        where: Optional[Callable[[Dict[str, Any]], bool]]
+    ) -> Optional[List[Dict[str, Any]]]:
+        
+        # Returns the rows matched by "column = value" through the primary key or a
+        # secondary index, or None if no index can answer the condition
+        if not isinstance(where, WhereNode) or where.op != '=':
+            return None
+        
+        if where.column == table_schema.get("primary_key") and self.index.has_index(table_name):
+            row = self.index.lookup(table_name, where.value)
+            return [row] if row is not None else []
+        
+        return self.index.lookup_secondary(table_name, where.column, where.value)
     
     def select_by_primary_key(
         self, 
@@ -96,7 +245,25 @@ class ExecutionEngine:
         pk_value: Any
     ) -> Optional[Dict[str, Any]]:
         
-        return self.index.lookup(table_name, pk_value)
+        return self.select_by_primary_keys(table_name, [pk_value])[0]
+    
+    def select_by_primary_keys(
+        self, 
+        table_name: str, 
+        pk_values: List[Any]
+    ) -> List[Optional[Dict[str, Any]]]:
+        
+        # One result per value, None where no row has that key. A table that was never
+        # loaded with load_table_index gets its index on the first lookup.
+        self._check_writes(table_name)
+        if not self.index.has_index(table_name):
+            if self.schema.get_table_schema(table_name).get("primary_key"):
+                self.load_table_index(table_name)
+        
+        # Copies, as in select_rows: the index holds the table's own row dicts
+        lookup = self.index.lookup
+        rows = [lookup(table_name, value) for value in pk_values]
+        return [row.copy() if row is not None else None for row in rows]
     
     def delete_rows(
         self, 
@@ -104,27 +271,52 @@ class ExecutionEngine:
         where: Callable[[Dict[str, Any]], bool]
     ) -> int:
         
-        rows = self.storage.read_table(table_name)
         table_schema = self.schema.get_table_schema(table_name)
         primary_key = table_schema.get("primary_key")
+        predicate = self._predicate(table_schema, where)
+        self._check_writes(table_name)
+        
+        # Equality on an indexed column finds the rows without testing every row. A value
+        # that isn't in the index matches nothing, so the file is left alone.
+        matched = self._index_matches(table_name, table_schema, where)
+        if matched == []:
+            return 0
+        
+        rows = self.storage.read_table(table_name)
         
         # Filter out rows that match delete condition
-        rows_to_keep = []
-        deleted_count = 0
+        if matched is None:
+            matched = []
+            rows_to_keep = []
+            for row in rows:
+                if predicate(row):
+                    matched.append(row)
+                else:
+                    rows_to_keep.append(row)
+            if not matched:
+                return 0
+        else:
+            # The index holds the table's own row dicts, so they are dropped by identity
+            removed = {id(row) for row in matched}
+            rows_to_keep = [row for row in rows if id(row) not in removed]
         
-        for row in rows:
-            if where(row):
-                # Delete from index
-                if primary_key:
-                    self.index.delete(table_name, row[primary_key])
-                deleted_count += 1
-            else:
-                rows_to_keep.append(row)
+        # Delete from index
+        deleted_keys = []
+        if primary_key:
+            for row in matched:
+                self.index.delete(table_name, row[primary_key])
+                deleted_keys.append(row[primary_key])
         
-        # Write remaining rows
-        self.storage.write_table(table_name, rows_to_keep)
+        if primary_key:
+            # Tombstones keyed by primary key are appended instead of rewriting the file
+            self.storage.delete_by_key(table_name, primary_key, deleted_keys, rows_to_keep)
+        else:
+            # Write remaining rows
+            self.storage.write_table(table_name, rows_to_keep)
         
-        return deleted_count
+        self.index.rebuild_secondary(table_name, rows_to_keep)
+        
+        return len(matched)
     
     def update_rows(
         self,
@@ -133,34 +325,58 @@ class ExecutionEngine:
         updates: Dict[str, Any]
     ) -> int:
         
-        rows = self.storage.read_table(table_name)
         table_schema = self.schema.get_table_schema(table_name)
         primary_key = table_schema.get("primary_key")
+        predicate = self._predicate(table_schema, where)
+        self._check_writes(table_name)
         
-        updated_count = 0
+        # Equality on an indexed column finds the rows without testing every row. A value
+        # that isn't in the index matches nothing, so the file is left alone.
+        matched = self._index_matches(table_name, table_schema, where)
+        if matched == []:
+            return 0
         
-        for row in rows:
-            if where(row):
-                old_pk = row.get(primary_key) if primary_key else None
-                
-                # Apply updates
-                for col, value in updates.items():
-                    if col in row:
-                        row[col] = value
-                
-                # Validate updated row
-                self.schema.validate_row(table_name, row)
-                
-                # Update index if primary key changed
-                if primary_key:
-                    new_pk = row[primary_key]
-                    if old_pk != new_pk:
-                        self.index.update(table_name, old_pk, row, primary_key)
-                
-                updated_count += 1
+        # Columns the table doesn't have are ignored. The values are the same for every
+        # matched row, so they are validated once per statement instead of once per row.
+        columns = table_schema["columns"]
+        updates = {col: value for col, value in updates.items() if col in columns}
+        self.schema.validate_values(table_name, updates)
+        
+        rows = self.storage.read_table(table_name)
+        if matched is None:
+            matched = [row for row in rows if predicate(row)]
+        
+        # Rows are shared with the storage cache and the index, so primary key
+        # uniqueness is checked before any row is modified
+        rekeyed = []
+        if primary_key in updates:
+            new_pk = updates[primary_key]
+            rekeyed = [
+                (row[primary_key], row) for row in matched if row[primary_key] != new_pk
+            ]
+            # Every matched row gets the same key, so more than one of them would collide
+            if len(rekeyed) > 1 or (
+                rekeyed and self.index.lookup(table_name, new_pk) is not None
+            ):
+                raise ValueError(
+                    f"Primary key violation: '{new_pk}' already exists"
+                )
+        
+        # Apply updates
+        for row in matched:
+            row.update(updates)
+        
+        # Update index for changed primary keys
+        for old_pk, row in rekeyed:
+            self.index.update(table_name, old_pk, row, primary_key)
         
         self.storage.write_table(table_name, rows)
-        return updated_count
+        
+        indexed_columns = self.index.secondary_columns.get(table_name, [])
+        if matched and any(col in updates for col in indexed_columns):
+            self.index.rebuild_secondary(table_name, rows)
+        
+        return len(matched)
     
     def nested_loop_join(
         self,
@@ -172,15 +388,75 @@ class ExecutionEngine:
         left_rows = self.storage.read_table(left_table)
         right_rows = self.storage.read_table(right_table)
         
+        return self._nested_loop_join_rows(left_rows, right_rows, on_column)
+    
+    def _nested_loop_join_rows(
+        self,
+        left_rows: List[Dict[str, Any]],
+        right_rows: List[Dict[str, Any]],
+        on_column: str
+    ) -> List[Dict[str, Any]]:
+        
+        # Extract every right key once instead of calling .get() for each pair; rows
+        # without a join key are skipped, like in the hash join
+        right_keyed = [
+            (right_row[on_column], right_row)
+            for right_row in right_rows
+            if right_row.get(on_column) is not None
+        ]
+        
         result = []
+        append = result.append
         
         for left_row in left_rows:
-            for right_row in right_rows:
+            left_key = left_row.get(on_column)
+            if left_key is None:
+                continue
+            
+            for right_key, right_row in right_keyed:
                 # Check if join condition is met
-                if left_row.get(on_column) == right_row.get(on_column):
-                    # Merge rows (right table overwrites left on conflict)
-                    merged = {**left_row, **right_row}
-                    result.append(merged)
+                if left_key == right_key:
+                    # Merge rows (right table overwrites left on conflict); copy+update
+                    # sizes the new dict once, unlike {**left_row, **right_row}
+                    merged = left_row.copy()
+                    merged.update(right_row)
+                    append(merged)
+        
+        return result
+    
+    def hash_join(
+        self,
+        left_table: str,
+        right_table: str,
+        on_column: str
+    ) -> List[Dict[str, Any]]:
+        
+        left_rows = self.storage.read_table(left_table)
+        right_rows = self.storage.read_table(right_table)
+        
+        if min(len(left_rows), len(right_rows)) < self.nested_loop_join_threshold:
+            return self._nested_loop_join_rows(left_rows, right_rows, on_column)
+        
+        # Build on the smaller relation, probe with the larger one: O(n + m) instead of O(n * m)
+        build_is_left = len(left_rows) <= len(right_rows)
+        build, probe = (left_rows, right_rows) if build_is_left else (right_rows, left_rows)
+        
+        hash_table = {}
+        for row in build:
+            key = row.get(on_column)
+            if key is None:
+                continue
+            hash_table.setdefault(key, []).append(row)
+        
+        result = []
+        
+        for probe_row in probe:
+            for build_row in hash_table.get(probe_row.get(on_column), ()):
+                # Merge rows (right table overwrites left on conflict)
+                if build_is_left:
+                    result.append({**build_row, **probe_row})
+                else:
+                    result.append({**probe_row, **build_row})
         
         return result
     
@@ -199,7 +475,18 @@ class ExecutionEngine:
        
         table_schema = self.schema.get_table_schema(table_name)
         primary_key = table_schema.get("primary_key")
+        indexed_columns = table_schema.get("indexes", [])
         
-        if primary_key:
+        if primary_key or indexed_columns:
             rows = self.storage.read_table(table_name)
-            self.index.build_index(table_name, rows, primary_key)
\ No newline at end of file
+            if primary_key:
+                self.index.build_index(table_name, rows, primary_key)
+            for column in indexed_columns:
+                self.index.build_secondary(table_name, column, rows)
+    
+    def create_index(self, table_name: str, column: str) -> None:
+        
+        # The index definition lives in the schema so it is rebuilt at every startup
+        self.schema.add_index(table_name, column)
+        rows = self.storage.read_table(table_name)
+        self.index.build_secondary(table_name, column, rows)
@@ -1,7 +1,7 @@
 # Implements in-memory hash-based indexing for O(1) primary key lookups.
 # hashmaps is used because of its simple implementation and sufficient for quality serches.
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 
 class IndexEngine:
@@ -9,6 +9,10 @@ class IndexEngine:
     def __init__(self):
        
         self.indexes: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        
+        # Secondary indexes map a column value to every row holding it
+        self.secondary: Dict[Tuple[str, str], Dict[Any, List[Dict[str, Any]]]] = {}
+        self.secondary_columns: Dict[str, List[str]] = {}
     
     def build_index(
         self, 
@@ -17,24 +21,30 @@ class IndexEngine:
         primary_key: str
     ) -> None:
         
-        index = {}
+        # Build in C; a missing key or a duplicate shows up as a KeyError or a size mismatch
+        try:
+            index = {row[primary_key]: row for row in rows}
+        except KeyError:
+            index = None
         
-        for row in rows:
-            pk_value = row.get(primary_key)
-            
-            if pk_value is None:
-                raise ValueError(
-                    f"Row missing primary key '{primary_key}': {row}"
-                )
-            
-            # Detect duplicate primary keys
-            if pk_value in index:
-                raise ValueError(
-                    f"Duplicate primary key '{pk_value}' in table '{table_name}'"
-                )
-            
-            
-            index[pk_value] = row
+        # Only on failure walk the rows again to report the first offending one
+        if index is None or len(index) != len(rows) or None in index:
+            seen = set()
+            for row in rows:
+                pk_value = row.get(primary_key)
+                
+                if pk_value is None:
+                    raise ValueError(
+                        f"Row missing primary key '{primary_key}': {row}"
+                    )
+                
+                # Detect duplicate primary keys
+                if pk_value in seen:
+                    raise ValueError(
+                        f"Duplicate primary key '{pk_value}' in table '{table_name}'"
+                    )
+                
+                seen.add(pk_value)
         
         self.indexes[table_name] = index
     
@@ -92,7 +102,59 @@ class IndexEngine:
        
         if table_name in self.indexes:
             del self.indexes[table_name]
+        
+        for column in self.secondary_columns.pop(table_name, []):
+            del self.secondary[(table_name, column)]
     
     def has_index(self, table_name: str) -> bool:
         
-        return table_name in self.indexes
\ No newline at end of file
+        return table_name in self.indexes
+    
+    def build_secondary(
+        self, 
+        table_name: str, 
+        column: str, 
+        rows: List[Dict[str, Any]]
+    ) -> None:
+        
+        index = {}
+        
+        for row in rows:
+            index.setdefault(row.get(column), []).append(row)
+        
+        if (table_name, column) not in self.secondary:
+            self.secondary_columns.setdefault(table_name, []).append(column)
+        self.secondary[(table_name, column)] = index
+    
+    def rebuild_secondary(
+        self, 
+        table_name: str, 
+        rows: List[Dict[str, Any]]
+    ) -> None:
+        
+        # One O(n) pass per index beats removing rows from value buckets one at a time
+        for column in self.secondary_columns.get(table_name, []):
+            self.build_secondary(table_name, column, rows)
+    
+    def insert_secondary(
+        self, 
+        table_name: str, 
+        row: Dict[str, Any]
+    ) -> None:
+        
+        for column in self.secondary_columns.get(table_name, []):
+            self.secondary[(table_name, column)].setdefault(row.get(column), []).append(row)
+    
+    def lookup_secondary(
+        self, 
+        table_name: str, 
+        column: str, 
+        value: Any
+    ) -> Optional[List[Dict[str, Any]]]:
+        
+        # None means the column has no index, an empty list means no row has the value
+        index = self.secondary.get((table_name, column))
+        if index is None:
+            return None
+        
+        return list(index.get(value, ()))
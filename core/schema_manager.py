@@ -2,7 +2,61 @@
 
 import json
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+INT_MIN = -(1 << 63)
+INT_MAX = (1 << 63) - 1
+
+# Exact Python types accepted for each column type (bool is deliberately not an Int)
+ACCEPTED_TYPES = {
+    "Int": (int,),
+    "String": (str,),
+    "Float": (int, float),
+    "Bool": (bool,),
+}
+
+
+# Per-table validation rules: (column, type, accepted Python types) for the typed
+# columns, the Int columns, and whether the table has a 'name' column
+_Rules = Tuple[Tuple[Tuple[str, str, Tuple[type, ...]], ...], Tuple[str, ...], bool]
+
+
+def _column_rules(columns: Dict[str, str]) -> _Rules:
+    
+    # Column types are resolved once so each check is a tuple membership test
+    return (
+        tuple(
+            (col, dtype, ACCEPTED_TYPES[dtype])
+            for col, dtype in columns.items()
+            if dtype in ACCEPTED_TYPES
+        ),
+        tuple(col for col, dtype in columns.items() if dtype == "Int"),
+        'name' in columns,
+    )
+
+
+def _check_values(rules: _Rules, values: Dict[str, Any]) -> None:
+    
+    # The value rules shared by full rows and partial updates; values holds every
+    # column the rules were built from
+    typed_columns, int_columns, check_name = rules
+    
+    for col, dtype, accepted in typed_columns:
+        value = values[col]
+        if type(value) not in accepted:
+            raise ValueError(
+                f"Column '{col}' expects {dtype}, got {type(value).__name__}"
+            )
+    
+    # Int is a signed 64-bit integer, like SQL BIGINT
+    for col in int_columns:
+        if not INT_MIN <= values[col] <= INT_MAX:
+            raise ValueError(
+                f"Column '{col}' value {values[col]} is out of range for Int"
+            )
+    
+    if check_name and str(values['name']).isdigit():
+        raise ValueError("Data Integrity Error: 'name' cannot be a number")
 
 
 class SchemaManager:
@@ -11,6 +65,19 @@ class SchemaManager:
         
         self.schema_path = schema_path
         self._ensure_schema_file()
+        
+        # Parsed schema, tagged with the file's (mtime_ns, size) when it was read
+        self._schema_cache: Optional[Dict[str, Any]] = None
+        self._schema_version: Optional[Tuple[int, int]] = None
+        
+        # Row validators and column name tuples per table, rebuilt whenever the schema changes
+        self._validators: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._column_names: Dict[str, Tuple[str, ...]] = {}
+    
+    def _file_version(self) -> Tuple[int, int]:
+        
+        st = os.stat(self.schema_path)
+        return st.st_mtime_ns, st.st_size
     
     def _ensure_schema_file(self) -> None:
         
@@ -22,11 +89,22 @@ class SchemaManager:
     
     def load_schema(self) -> Dict[str, Any]:
         
+        # Re-parse only when the file changed; the cached dict is shared with callers
+        version = self._file_version()
+        if self._schema_cache is not None and version == self._schema_version:
+            return self._schema_cache
+        
         try:
             with open(self.schema_path, 'r') as f:
-                return json.load(f)
+                schema = json.load(f)
         except json.JSONDecodeError as e:
             raise ValueError(f"Corrupted schema file: {e}")
+        
+        self._schema_cache = schema
+        self._schema_version = version
+        self._validators.clear()
+        self._column_names.clear()
+        return schema
     
     def save_schema(self, schema: Dict[str, Any]) -> None:
         
@@ -39,7 +117,14 @@ class SchemaManager:
         except Exception as e:
             if os.path.exists(temp_path):
                 os.remove(temp_path)
+            # Callers edit the cached dict before saving, so it no longer matches the file
+            self._schema_cache = None
             raise IOError(f"Failed to save schema: {e}")
+        
+        self._schema_cache = schema
+        self._schema_version = self._file_version()
+        self._validators.clear()
+        self._column_names.clear()
     
     def create_table_schema(
         self, 
@@ -62,6 +147,9 @@ class SchemaManager:
         # Validate data types
         valid_types = {"Int", "String", "Float", "Bool"}
         for col, dtype in columns.items():
+            # '$' is reserved for storage records such as delete tombstones
+            if col.startswith('$'):
+                raise ValueError(f"Column name '{col}' cannot start with '$'")
             if dtype not in valid_types:
                 raise ValueError(
                     f"Invalid data type '{dtype}' for column '{col}'. "
@@ -75,6 +163,25 @@ class SchemaManager:
         
         self.save_schema(schema)
     
+    def add_index(self, table_name: str, column: str) -> None:
+        
+        schema = self.load_schema()
+        
+        if table_name not in schema:
+            raise ValueError(f"Table '{table_name}' not found in schema")
+        
+        table_schema = schema[table_name]
+        
+        if column not in table_schema["columns"]:
+            raise ValueError(f"Column '{column}' not found in table '{table_name}'")
+        
+        indexes = table_schema.setdefault("indexes", [])
+        if column in indexes:
+            raise ValueError(f"Index on '{table_name}.{column}' already exists")
+        
+        indexes.append(column)
+        self.save_schema(schema)
+    
     def get_table_schema(self, table_name: str) -> Dict[str, Any]:
        
         schema = self.load_schema()
@@ -84,6 +191,18 @@ class SchemaManager:
         
         return schema[table_name]
     
+    def get_column_names(self, table_name: str) -> Tuple[str, ...]:
+        
+        # Fetching the schema first drops stale tuples if the file changed
+        table_schema = self.get_table_schema(table_name)
+        
+        names = self._column_names.get(table_name)
+        if names is None:
+            names = tuple(table_schema["columns"])
+            self._column_names[table_name] = names
+        
+        return names
+    
     def drop_table_schema(self, table_name: str) -> None:
         
         schema = self.load_schema()
@@ -101,43 +220,46 @@ class SchemaManager:
     
     def validate_row(self, table_name: str, row: Dict[str, Any]) -> None:
         
+        # Fetching the schema first drops stale validators if the file changed
         table_schema = self.get_table_schema(table_name)
-        columns = table_schema["columns"]
         
-        # Check for missing columns
-        for col in columns:
-            if col not in row:
-                raise ValueError(f"Missing required column: {col}")
+        validator = self._validators.get(table_name)
+        if validator is None:
+            validator = self._compile_validator(table_schema["columns"])
+            self._validators[table_name] = validator
         
-        # Check for extra columns
-        for col in row:
-            if col not in columns:
-                raise ValueError(f"Unknown column: {col}")
+        validator(row)
+    
+    def validate_values(self, table_name: str, values: Dict[str, Any]) -> None:
         
+        # Checks a partial row, such as the SET clause of an UPDATE. Callers pass only
+        # columns the table has.
+        columns = self.get_table_schema(table_name)["columns"]
         
-        for col, expected_type in columns.items():
-            value = row[col]
+        _check_values(_column_rules({col: columns[col] for col in values}), values)
+    
+    def _compile_validator(
+        self, 
+        columns: Dict[str, str]
+    ) -> Callable[[Dict[str, Any]], None]:
+        
+        rules = _column_rules(columns)
+        column_set = frozenset(columns)
+        
+        def validator(row: Dict[str, Any]) -> None:
             
-            if expected_type == "Int":
-                if not isinstance(value, int) or isinstance(value, bool):
-                    raise ValueError(
-                        f"Column '{col}' expects Int, got {type(value).__name__}"
-                    )
-            elif expected_type == "String":
-                if not isinstance(value, str):
-                    raise ValueError(
-                        f"Column '{col}' expects String, got {type(value).__name__}"
-                    )
-            elif expected_type == "Float":
-                if not isinstance(value, (int, float)) or isinstance(value, bool):
-                    raise ValueError(
-                        f"Column '{col}' expects Float, got {type(value).__name__}"
-                    )
-            elif expected_type == "Bool":
-                if not isinstance(value, bool):
-                    raise ValueError(
-                        f"Column '{col}' expects Bool, got {type(value).__name__}"
-                    )
-        if 'name' in row:
-            if str(row['name']).isdigit():
-                raise ValueError("Data Integrity Error: 'name' cannot be a number")
\ No newline at end of file
+            # One set comparison in C; the loops only run to name the offending column
+            if row.keys() != column_set:
+                # Check for missing columns
+                for col in columns:
+                    if col not in row:
+                        raise ValueError(f"Missing required column: {col}")
+                
+                # Check for extra columns
+                for col in row:
+                    if col not in columns:
+                        raise ValueError(f"Unknown column: {col}")
+            
+            _check_values(rules, row)
+        
+        return validator
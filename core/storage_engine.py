@@ -1,22 +1,204 @@
 #Handles low-level file I/O operations for table data persistence.
+#Tables are stored as JSON Lines (one row object per line) so inserts can append instead of rewriting the file.
 
+import atexit
 import json
+import logging
+import mmap
 import os
-from typing import Dict, List, Any, Optional
+import queue
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Set, Callable
+
+try:
+    # NumPy is optional; without it column arrays are unavailable and filters scan rows
+    import numpy as np
+    _NUMPY_DTYPES = {"Int": np.int64, "Float": np.float64}
+except ImportError:
+    np = None
+    _NUMPY_DTYPES = {}
+
+try:
+    # orjson encodes and decodes several times faster than the stdlib json module; it is optional
+    import orjson
+except ImportError:
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+logger = logging.getLogger(__name__)
+
+# A line of the form {"$delete": {"<key column>": <value>}} marks the earlier row with that
+# key as deleted. Column names can't start with '$', so no row has this key.
+TOMBSTONE_KEY = "$delete"
+_TOMBSTONE_MARKER = b'"$delete"'
+
+
+def _encode_row(row: Dict[str, Any]) -> bytes:
+    
+    # Compact output: no indentation or separator padding in table files
+    if orjson is not None:
+        try:
+            return orjson.dumps(row)
+        except TypeError:
+            # orjson rejects integers wider than 64 bits
+            pass
+    return json.dumps(row, separators=(',', ':')).encode()
+
+
+def _encode_lines(rows: List[Dict[str, Any]]) -> bytes:
+    
+    return b''.join([_encode_row(row) + b'\n' for row in rows])
+
+
+def _decode_lines(content: bytes) -> List[Dict[str, Any]]:
+    
+    # Decoding all lines as one JSON array is a single C-level call, and the decoder
+    # then reuses one string object per column name for every row. Parsing line by
+    # line would give each row its own copies of the keys.
+    try:
+        return _loads(b'[' + content.strip().replace(b'\n', b',') + b']')
+    except ValueError:
+        # Blank lines break the joined form; parse line by line, which skips them
+        return [_loads(line) for line in content.splitlines() if line.strip()]
+
+
+def _apply_tombstones(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    
+    # Replays the file in order: each tombstone removes the latest live row with its key,
+    # so a key that is deleted and inserted again keeps the newer row
+    key_columns = {
+        column
+        for record in records if TOMBSTONE_KEY in record
+        for column in record[TOMBSTONE_KEY]
+    }
+    live: List[Optional[Dict[str, Any]]] = []
+    positions: Dict[Tuple[str, Any], int] = {}
+    
+    for record in records:
+        tombstone = record.get(TOMBSTONE_KEY)
+        if tombstone is None:
+            for column in key_columns:
+                positions[(column, record.get(column))] = len(live)
+            live.append(record)
+        else:
+            for column, value in tombstone.items():
+                position = positions.pop((column, value), None)
+                if position is not None:
+                    live[position] = None
+    
+    return [row for row in live if row is not None]
 
 
 class StorageEngine:
+    
+    # Once tombstones and the rows they cancel make up this share of a table file,
+    # the next delete rewrites the file with only the live rows
+    compaction_ratio = 0.3
+    
+    # Whether the writer thread fsyncs each file it writes before reporting it done
+    fsync_writes = True
        
     def __init__(self, data_dir: str = "data"):
        
         self.data_dir = data_dir
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
+        
+        # Tables known to be stored as JSON Lines, so appends can skip the legacy-format check
+        self._jsonl_tables = set()
+        
+        # Parsed rows per table, tagged with the file's (mtime_ns, size) when they were read,
+        # or None while a write of them is still queued
+        self._cache: Dict[str, Tuple[Optional[Tuple[int, int]], List[Dict[str, Any]]]] = {}
+        
+        # NumPy arrays of numeric columns built from the cached rows; they are dropped
+        # whenever the table's rows change
+        self._columns: Dict[str, Dict[str, Any]] = {}
+        
+        # Per-table counters bumped on every change to the rows; they are never reset,
+        # so a dropped and recreated table keeps counting up
+        self._versions: Dict[str, int] = {}
+        
+        # Writes deferred by begin_batch until the matching end_batch
+        self._batch_depth = 0
+        self._pending_rewrites: Set[str] = set()
+        self._pending_appends: Dict[str, List[Dict[str, Any]]] = {}
+        
+        # Lines per table file that no longer hold a live row (tombstones plus the rows they delete)
+        self._dead_records: Dict[str, int] = {}
+        
+        # Length of the whole lines in table files found ending in a partial line, which
+        # an interrupted append leaves behind; the next append cuts the file back to it
+        self._torn_tails: Dict[str, int] = {}
+        
+        # File writes run on one background thread so callers don't wait on the disk.
+        # Rows are encoded on the calling thread; the writer only does file I/O. While a
+        # table has queued writes its cached rows are ahead of the file and are used as is.
+        # The lock is reentrant so _changed can take it from inside other locked sections.
+        self._lock = threading.RLock()
+        self._pending_writes: Dict[str, int] = {}
+        
+        # Failed writes not yet reported to a caller, and a count of all failures per table
+        # so the owner of the indexes can tell that the cached rows were dropped
+        self._write_errors: Dict[str, Exception] = {}
+        self._failed_writes: Dict[str, int] = {}
+        self._write_queue: "queue.Queue[Tuple[str, Callable[[str, bytes], None], bytes]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._writer_loop, name="storage-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
     
     def _get_table_path(self, table_name: str) -> str:
         
         return os.path.join(self.data_dir, f"{table_name}.json")
     
+    def _file_version(self, table_name: str) -> Tuple[int, int]:
+        
+        try:
+            st = os.stat(self._get_table_path(table_name))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Table '{table_name}' does not exist")
+        return st.st_mtime_ns, st.st_size
+    
+    def _changed(self, table_name: str) -> None:
+        
+        # The writer thread bumps versions too, when a failed write drops the cached rows
+        with self._lock:
+            self._columns.pop(table_name, None)
+            self._versions[table_name] = self._versions.get(table_name, 0) + 1
+    
+    def table_version(self, table_name: str) -> int:
+        
+        # Equal versions mean the table's rows haven't changed in between. Reading first
+        # picks up edits made to the file outside this engine.
+        self.read_table(table_name)
+        return self._versions.get(table_name, 0)
+    
+    def _cached_rows(self, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        
+        # The cached rows if they reflect the table's current state, else None. Checked
+        # under the lock so the writer can't retag or drop the entry in between.
+        with self._lock:
+            cached = self._cache.get(table_name)
+            if cached is None:
+                return None
+            if self._pending_writes.get(table_name) or cached[0] == self._file_version(table_name):
+                return cached[1]
+            return None
+    
+    def write_failures(self, table_name: str) -> int:
+        
+        # Grows by one every time a background write to the table fails
+        return self._failed_writes.get(table_name, 0)
+    
+    def _raise_write_error(self, table_name: str) -> None:
+        
+        # Reports a failed background write to the table once, on the next call that touches it
+        with self._lock:
+            error = self._write_errors.pop(table_name, None)
+        if error is not None:
+            raise error
+    
     def table_exists(self, table_name: str) -> bool:
         
         return os.path.exists(self._get_table_path(table_name))
@@ -27,35 +209,124 @@ class StorageEngine:
         if os.path.exists(table_path):
             raise FileExistsError(f"Table '{table_name}' already exists")
         
-        with open(table_path, 'w') as f:
-            json.dump([], f, indent=2)
+        # An empty JSON-Lines file is an empty table
+        open(table_path, 'wb').close()
+        with self._lock:
+            self._cache[table_name] = (self._file_version(table_name), [])
+            self._changed(table_name)
+        self._jsonl_tables.add(table_name)
     
     def read_table(self, table_name: str) -> List[Dict[str, Any]]:
         
+        # The returned list is shared with the cache; callers that modify it must write it back
+        self._raise_write_error(table_name)
+        rows = self._cached_rows(table_name)
+        if rows is not None:
+            return rows
+        
+        # Nothing cached but writes still queued: the file is only complete once they land
+        if self._pending_writes.get(table_name):
+            self._write_queue.join()
+            self._raise_write_error(table_name)
+        
+        version = self._file_version(table_name)
         table_path = self._get_table_path(table_name)
         
-        if not os.path.exists(table_path):
-            raise FileNotFoundError(f"Table '{table_name}' does not exist")
+        content = self._read_file(table_path)
         
         try:
-            with open(table_path, 'r') as f:
-                data = json.load(f)
+            # Tables written before the JSON-Lines format hold a single JSON array
+            if content[:1] == b'[':
+                data = json.loads(content)
                 # Defensive check that ensures file contains valid list
                 if not isinstance(data, list):
                     raise ValueError(f"Corrupted table file: {table_name}")
-                return data
+                legacy = True
+            else:
+                if not content.endswith(b'\n') and content:
+                    content = self._drop_torn_tail(table_name, content)
+                data = _decode_lines(content)
+                legacy = False
+                # A plain byte search keeps tables without deletes on the fast path
+                if _TOMBSTONE_MARKER in content:
+                    records = len(data)
+                    data = _apply_tombstones(data)
+                    self._dead_records[table_name] = records - len(data)
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in table '{table_name}': {e}")
+        
+        if legacy:
+            # Rewriting also caches the rows
+            self.write_table(table_name, data)
+        else:
+            with self._lock:
+                self._cache[table_name] = (version, data)
+                self._changed(table_name)
+        self._jsonl_tables.add(table_name)
+        return data
+    
+    def _drop_torn_tail(self, table_name: str, content: bytes) -> bytes:
+        
+        # Every complete line ends in a newline, so the last line is the remains of a
+        # write that never finished. Its row was never reported as stored.
+        end = content.rfind(b'\n') + 1
+        logger.warning(
+            "Table '%s' ends in a partial line (%d bytes), likely from an interrupted "
+            "append; ignoring it", table_name, len(content) - end
+        )
+        with self._lock:
+            self._torn_tails[table_name] = end
+        return content[:end]
+    
+    @staticmethod
+    def _read_file(path: str) -> bytes:
+        
+        # Copying straight out of a read-only mapping takes one memcpy from the page
+        # cache; a buffered read() of a multi-megabyte file was several times slower
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # Empty files can't be mapped
+                return b''
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:]
     
     def write_table(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
         
+        self._raise_write_error(table_name)
+        
+        if self._batch_depth:
+            # Deferred to end_batch; the cache holds the table's state until then
+            with self._lock:
+                self._cache[table_name] = (self._file_version(table_name), rows)
+                self._changed(table_name)
+                self._pending_rewrites.add(table_name)
+                self._pending_appends.pop(table_name, None)
+            return
+        
+        self._rewrite_file(table_name, rows)
+    
+    def _rewrite_file(self, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        
+        self._submit(table_name, rows, self._replace_file, _encode_lines(rows))
+        self._dead_records.pop(table_name, None)
+        self._jsonl_tables.add(table_name)
+    
+    def _replace_file(self, table_name: str, payload: bytes) -> None:
+        
         table_path = self._get_table_path(table_name)
         temp_path = table_path + ".tmp"
         
+        # The new file has no partial line to cut off
+        with self._lock:
+            self._torn_tails.pop(table_name, None)
+        
         try:
-            # Write to temporary file
-            with open(temp_path, 'w') as f:
-                json.dump(rows, f, indent=2)
+            # Write to temporary file, one JSON object per line
+            with open(temp_path, 'wb') as f:
+                f.write(payload)
+                if self.fsync_writes:
+                    f.flush()
+                    os.fsync(f.fileno())
             
            
             os.replace(temp_path, table_path)
@@ -66,10 +337,263 @@ class StorageEngine:
                 os.remove(temp_path)
             raise IOError(f"Failed to write table '{table_name}': {e}")
     
+    def append_row(self, table_name: str, row: Dict[str, Any]) -> None:
+        
+        self._raise_write_error(table_name)
+        
+        # Reading once converts a legacy JSON array file so appending a line keeps it valid
+        if table_name not in self._jsonl_tables:
+            self.read_table(table_name)
+        
+        if self._batch_depth:
+            # Deferred to end_batch; a table already due for a rewrite needs no separate append
+            self.read_table(table_name).append(row)
+            self._changed(table_name)
+            if table_name not in self._pending_rewrites:
+                self._pending_appends.setdefault(table_name, []).append(row)
+            return
+        
+        payload = _encode_row(row) + b'\n'
+        
+        # Keep the cached rows in step only if they matched the file before this append
+        rows = self._cached_rows(table_name)
+        if rows is not None:
+            rows.append(row)
+        self._submit(table_name, rows, self._append_to_file, payload)
+    
+    def delete_by_key(
+        self, 
+        table_name: str, 
+        key_column: str, 
+        keys: List[Any], 
+        rows: List[Dict[str, Any]]
+    ) -> None:
+        
+        # Deletes rows by appending a tombstone per key instead of rewriting the file.
+        # rows is the table's content after the delete and becomes the cached state.
+        self._raise_write_error(table_name)
+        dead = self._dead_records.get(table_name, 0) + 2 * len(keys)
+        if dead > self.compaction_ratio * (dead + len(rows)):
+            self.write_table(table_name, rows)
+            return
+        
+        self._dead_records[table_name] = dead
+        tombstones = [{TOMBSTONE_KEY: {key_column: key}} for key in keys]
+        
+        if self._batch_depth:
+            # Deferred to end_batch like append_row; a pending rewrite already drops the rows
+            with self._lock:
+                self._cache[table_name] = (self._file_version(table_name), rows)
+                self._changed(table_name)
+                if table_name not in self._pending_rewrites:
+                    self._pending_appends.setdefault(table_name, []).extend(tombstones)
+            return
+        
+        self._submit(table_name, rows, self._append_to_file, _encode_lines(tombstones))
+    
+    def _append_to_file(self, table_name: str, payload: bytes) -> None:
+        
+        table_path = self._get_table_path(table_name)
+        with self._lock:
+            torn_tail = self._torn_tails.get(table_name)
+        
+        size = None
+        try:
+            if torn_tail is not None:
+                os.truncate(table_path, torn_tail)
+                with self._lock:
+                    self._torn_tails.pop(table_name, None)
+            with open(table_path, 'ab') as f:
+                size = f.tell()
+                f.write(payload)
+                if self.fsync_writes:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception as e:
+            # Cut off any part of the payload that got in, so the next append doesn't
+            # land on the end of a half-written line
+            if size is not None:
+                try:
+                    os.truncate(table_path, size)
+                except OSError:
+                    pass
+            raise IOError(f"Failed to append to table '{table_name}': {e}")
+    
+    def _submit(
+        self, 
+        table_name: str, 
+        rows: Optional[List[Dict[str, Any]]], 
+        write: Callable[[str, bytes], None], 
+        payload: bytes
+    ) -> None:
+        
+        # Queues a file write; rows (the table's state once it lands) become the cached
+        # rows right away. With rows None the cache is dropped and the next read waits.
+        with self._lock:
+            self._pending_writes[table_name] = self._pending_writes.get(table_name, 0) + 1
+            # Rows read before a failed write that hasn't been reported yet may hold rows
+            # the file never got, so they aren't cached either
+            if rows is None or table_name in self._write_errors:
+                self._cache.pop(table_name, None)
+            else:
+                self._cache[table_name] = (None, rows)
+            self._changed(table_name)
+        self._write_queue.put((table_name, write, payload))
+    
+    def _writer_loop(self) -> None:
+        
+        while True:
+            jobs = [self._write_queue.get()]
+            # Everything queued while the previous group was on disk goes out together
+            while True:
+                try:
+                    jobs.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                self._write_jobs(jobs)
+            except Exception:
+                # _write_jobs records per-table failures itself; this only keeps the thread alive
+                logger.exception("Storage writer failed")
+            finally:
+                # Always settled, or flush() and everything that calls it would block forever
+                for _ in jobs:
+                    self._write_queue.task_done()
+    
+    def _write_jobs(self, jobs: List[Tuple[str, Callable[[str, bytes], None], bytes]]) -> None:
+        
+        # Per table, a rewrite carries the whole table and supersedes earlier writes,
+        # and consecutive appends become one write and one fsync
+        writes: Dict[str, List[Tuple[Callable[[str, bytes], None], List[bytes]]]] = {}
+        counts: Dict[str, int] = {}
+        for table_name, write, payload in jobs:
+            counts[table_name] = counts.get(table_name, 0) + 1
+            table_writes = writes.setdefault(table_name, [])
+            if write == self._replace_file:
+                table_writes.clear()
+            if table_writes and table_writes[-1][0] == write:
+                table_writes[-1][1].append(payload)
+            else:
+                table_writes.append((write, [payload]))
+        
+        for table_name, table_writes in writes.items():
+            error = None
+            try:
+                for write, payloads in table_writes:
+                    write(table_name, b''.join(payloads))
+            except Exception as e:
+                error = e
+            
+            with self._lock:
+                remaining = self._pending_writes[table_name] - counts[table_name]
+                if remaining:
+                    self._pending_writes[table_name] = remaining
+                else:
+                    # Every queued write has landed; tag the cache with the file's new version
+                    del self._pending_writes[table_name]
+                    cached = self._cache.get(table_name)
+                    if cached is not None and error is None:
+                        try:
+                            self._cache[table_name] = (self._file_version(table_name), cached[1])
+                        except FileNotFoundError:
+                            self._cache.pop(table_name, None)
+                        except OSError as e:
+                            error = e
+                
+                if error is not None:
+                    self._write_failed(table_name, error)
+    
+    def _write_failed(self, table_name: str, error: Exception) -> None:
+        
+        # Called with the lock held. The file is missing this write, so the cached rows no
+        # longer match it and are dropped, unless a batch is about to rewrite the whole table.
+        logger.error("Write to table '%s' failed: %s", table_name, error)
+        if table_name not in self._pending_rewrites:
+            self._cache.pop(table_name, None)
+            self._changed(table_name)
+        self._write_errors.setdefault(table_name, error)
+        self._failed_writes[table_name] = self._failed_writes.get(table_name, 0) + 1
+    
+    def flush(self) -> None:
+        
+        # Blocks until every queued write is on disk and raises the first one that failed.
+        # Failures are reported once, so later calls for those tables don't raise them again.
+        self._write_queue.join()
+        with self._lock:
+            errors, self._write_errors = self._write_errors, {}
+        if errors:
+            raise next(iter(errors.values()))
+    
+    def column_array(self, table_name: str, column: str, dtype: str) -> Optional[Any]:
+        
+        # A NumPy array of an Int or Float column, aligned with read_table's rows, or None
+        # when NumPy isn't installed or the values don't fit the array type
+        numpy_dtype = _NUMPY_DTYPES.get(dtype)
+        if numpy_dtype is None:
+            return None
+        
+        # Reading first drops stale arrays if the file changed on disk
+        rows = self.read_table(table_name)
+        arrays = self._columns.setdefault(table_name, {})
+        
+        if column not in arrays:
+            try:
+                arrays[column] = np.fromiter(
+                    (row[column] for row in rows), dtype=numpy_dtype, count=len(rows)
+                )
+            except (KeyError, TypeError, ValueError, OverflowError):
+                return None
+        
+        return arrays[column]
+    
+    def begin_batch(self) -> None:
+        
+        # Until the matching end_batch, writes only update the in-memory cache. Batches
+        # nest; only the outermost end_batch touches the disk. Changes made inside a
+        # batch are lost if the process dies before it ends.
+        self._batch_depth += 1
+    
+    def end_batch(self) -> None:
+        
+        if self._batch_depth == 0:
+            raise RuntimeError("end_batch called without begin_batch")
+        
+        self._batch_depth -= 1
+        if self._batch_depth:
+            return
+        
+        with self._lock:
+            rewrites = {table_name: self._cache[table_name][1] for table_name in self._pending_rewrites}
+            self._pending_rewrites = set()
+            appends, self._pending_appends = self._pending_appends, {}
+        
+        # One atomic rewrite or one append per table, however many statements touched it
+        for table_name, rows in rewrites.items():
+            self._rewrite_file(table_name, rows)
+        
+        for table_name, records in appends.items():
+            cached = self._cache.get(table_name)
+            self._submit(
+                table_name, cached[1] if cached else None, self._append_to_file, _encode_lines(records)
+            )
+    
     def delete_table_file(self, table_name: str) -> None:
        
+        # Queued writes to this table must land before the file goes away
+        self._write_queue.join()
+        
         table_path = self._get_table_path(table_name)
         if os.path.exists(table_path):
             os.remove(table_path)
+            with self._lock:
+                self._cache.pop(table_name, None)
+                self._changed(table_name)
+                self._write_errors.pop(table_name, None)
+            self._pending_rewrites.discard(table_name)
+            self._pending_appends.pop(table_name, None)
+            self._dead_records.pop(table_name, None)
+            self._torn_tails.pop(table_name, None)
+            self._jsonl_tables.discard(table_name)
         else:
             raise FileNotFoundError(f"Table '{table_name}' does not exist")
\ No newline at end of file
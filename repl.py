@@ -5,10 +5,74 @@ It is lightweight and shows how pattern matching
 """
 
 import re
+import sys
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from core.storage_engine import StorageEngine
 from core.schema_manager import SchemaManager
-from core.execution_engine import ExecutionEngine
+from core.execution_engine import ExecutionEngine, WhereNode
+
+
+# Statement patterns are compiled once at import instead of on every call
+_INDEX_RE = re.compile(r'CREATE INDEX ON (\w+)\s*\(\s*(\w+)\s*\)', re.IGNORECASE)
+_CREATE_RE = re.compile(r'CREATE TABLE (\w+) \((.*?)\)(?:\s+PRIMARY KEY (\w+))?', re.IGNORECASE)
+_INSERT_RE = re.compile(r'INSERT INTO (\w+) VALUES \((.*)\)', re.IGNORECASE)
+_SELECT_RE = re.compile(r'SELECT (.*?) FROM (\w+)(?:\s+WHERE (.+))?', re.IGNORECASE)
+_DELETE_RE = re.compile(r'DELETE FROM (\w+) WHERE (.+)', re.IGNORECASE)
+_UPDATE_RE = re.compile(r'UPDATE (\w+) SET (.+?) WHERE (.+)', re.IGNORECASE)
+_JOIN_RE = re.compile(r'JOIN (\w+)\s*,\s*(\w+) ON (\w+)', re.IGNORECASE)
+# Two-character operators come first so '>=' is not read as '>' followed by '= value'
+_WHERE_RE = re.compile(r'(\w+)\s*(>=|<=|!=|=|>|<)\s*(.+)')
+
+# One literal: "double quoted" | 'single quoted' | float | int | true/false | bare word.
+# The group that matched decides the type, so no value is parsed twice.
+_LITERAL = r'''\s*(?:"([^"]*)"|'([^']*)'|(-?(?:\d+\.\d*|\.\d+))|(-?\d+)|(true|false)|([^,]*?))\s*'''
+_VALUE_RE = re.compile(_LITERAL + r'(?:,|$)', re.IGNORECASE)
+_LITERAL_RE = re.compile(_LITERAL + r'$', re.IGNORECASE)
+_CONVERTERS = (None, str, str, float, int, lambda s: s.lower() == 'true', str)
+_PYTHON_OPERATORS = {'=': '==', '!=': '!=', '>': '>', '<': '<', '>=': '>=', '<=': '<='}
+
+
+def _parse_literal(text: str) -> Any:
+    
+    match = _LITERAL_RE.match(text)
+    if not match:
+        return text.strip()
+    kind = match.lastindex
+    return _CONVERTERS[kind](match.group(kind))
+
+
+@lru_cache(maxsize=256)
+def _compile_where(where_str: str) -> WhereNode:
+    
+    # Parse condition: column operator value
+    match = _WHERE_RE.match(where_str.strip())
+    
+    if not match:
+        raise ValueError(f"Invalid WHERE clause: {where_str}")
+    
+    column = match.group(1)
+    operator = match.group(2)
+    value = _parse_literal(match.group(3))
+    
+    # Generate a predicate specialised to this column and operator. The value is bound as a
+    # default argument (a fast local) and row[column] is a plain subscript, not a .get() call.
+    # A column the rows don't have is reported as unknown instead of a bare KeyError; the
+    # try block costs nothing while no exception is raised.
+    python_operator = _PYTHON_OPERATORS.get(operator)
+    if python_operator is None:
+        raise ValueError(f"Unsupported operator: {operator}")
+    
+    source = (
+        f"def predicate(row, _value=_value):\n"
+        f"    try:\n"
+        f"        return row[{column!r}] {python_operator} _value\n"
+        f"    except KeyError:\n"
+        f"        raise ValueError({f'Unknown column: {column}'!r}) from None\n"
+    )
+    namespace = {'_value': value}
+    exec(source, namespace)
+    return WhereNode(column, operator, value, namespace['predicate'])
 
 
 class REPL:
@@ -19,6 +83,17 @@ class REPL:
         self.schema = SchemaManager()
         self.executor = ExecutionEngine(self.storage, self.schema)
         self._load_all_indexes()
+        
+        # Statement handlers keyed by the upper-cased leading keyword
+        self._handlers = {
+            'CREATE': self._execute_create,
+            'INSERT': self._execute_insert,
+            'SELECT': self._execute_select,
+            'DELETE': self._execute_delete,
+            'UPDATE': self._execute_update,
+            'JOIN': self._execute_join,
+            'DROP': self._execute_drop,
+        }
     
     def _load_all_indexes(self) -> None:
 
@@ -35,8 +110,7 @@ class REPL:
     
     def parse_create_table(self, sql: str) -> Optional[Dict[str, Any]]:
        
-        pattern = r'CREATE TABLE (\w+) \((.*?)\)(?:\s+PRIMARY KEY (\w+))?'
-        match = re.match(pattern, sql.strip(), re.IGNORECASE)
+        match = _CREATE_RE.match(sql.strip())
         
         if not match:
             return None
@@ -60,10 +134,21 @@ class REPL:
             'primary_key': primary_key
         }
     
+    def parse_create_index(self, sql: str) -> Optional[Dict[str, Any]]:
+        
+        match = _INDEX_RE.match(sql.strip())
+        
+        if not match:
+            return None
+        
+        return {
+            'table': match.group(1),
+            'column': match.group(2)
+        }
+    
     def parse_insert(self, sql: str) -> Optional[Dict[str, Any]]:
         
-        pattern = r'INSERT INTO (\w+) VALUES \((.*?)\)'
-        match = re.match(pattern, sql.strip(), re.IGNORECASE)
+        match = _INSERT_RE.match(sql.strip())
         
         if not match:
             return None
@@ -71,42 +156,24 @@ class REPL:
         table_name = match.group(1)
         values_str = match.group(2)
         
-        # Parse values. It handles strings in quotes, numbers, booleans
+        # Scan values in one pass. It handles strings in quotes, numbers, booleans
         values = []
+        pos = 0
         
-        for value in re.findall(r'"([^"]*)"|\'([^\']*)\'|([^,]+)', values_str):
-           
-            val = value[0] or value[1] or value[2]
-            val = val.strip()
-            
-            if val.lower() == 'true':
-                values.append(True)
-            elif val.lower() == 'false':
-                values.append(False)
-            elif val.isdigit() or (val[0] == '-' and val[1:].isdigit()):
-                values.append(int(val))
-            elif self._is_float(val):
-                values.append(float(val))
-            else:
-                values.append(val)
+        while pos < len(values_str):
+            value = _VALUE_RE.match(values_str, pos)
+            kind = value.lastindex
+            values.append(_CONVERTERS[kind](value.group(kind)))
+            pos = value.end()
         
         return {
             'table': table_name,
             'values': values
         }
     
-    def _is_float(self, s: str) -> bool:
-       
-        try:
-            float(s)
-            return '.' in s
-        except ValueError:
-            return False
-    
     def parse_select(self, sql: str) -> Optional[Dict[str, Any]]:
         
-        pattern = r'SELECT (.*?) FROM (\w+)(?:\s+WHERE (.+))?'
-        match = re.match(pattern, sql.strip(), re.IGNORECASE)
+        match = _SELECT_RE.match(sql.strip())
         
         if not match:
             return None
@@ -133,8 +200,7 @@ class REPL:
     
     def parse_delete(self, sql: str) -> Optional[Dict[str, Any]]:
         
-        pattern = r'DELETE FROM (\w+) WHERE (.+)'
-        match = re.match(pattern, sql.strip(), re.IGNORECASE)
+        match = _DELETE_RE.match(sql.strip())
         
         if not match:
             return None
@@ -149,8 +215,7 @@ class REPL:
     
     def parse_update(self, sql: str) -> Optional[Dict[str, Any]]:
         
-        pattern = r'UPDATE (\w+) SET (.+?) WHERE (.+)'
-        match = re.match(pattern, sql.strip(), re.IGNORECASE)
+        match = _UPDATE_RE.match(sql.strip())
         
         if not match:
             return None
@@ -163,20 +228,7 @@ class REPL:
         updates = {}
         for assignment in set_str.split(','):
             col, val = assignment.split('=')
-            col = col.strip()
-            val = val.strip().strip('"\'')
-            
-           
-            if val.isdigit():
-                val = int(val)
-            elif self._is_float(val):
-                val = float(val)
-            elif val.lower() == 'true':
-                val = True
-            elif val.lower() == 'false':
-                val = False
-            
-            updates[col] = val
+            updates[col.strip()] = _parse_literal(val)
         
         return {
             'table': table_name,
@@ -186,8 +238,7 @@ class REPL:
     
     def parse_join(self, sql: str) -> Optional[Dict[str, Any]]:
         
-        pattern = r'JOIN (\w+)\s*,\s*(\w+) ON (\w+)'
-        match = re.match(pattern, sql.strip(), re.IGNORECASE)
+        match = _JOIN_RE.match(sql.strip())
         
         if not match:
             return None
@@ -198,53 +249,34 @@ class REPL:
             'on_column': match.group(3)
         }
     
-    def _parse_where_clause(self, where_str: str) -> callable:
-       
-        # Parse condition: column operator value
-        pattern = r'(\w+)\s*(=|>|<|>=|<=|!=)\s*(.+)'
-        match = re.match(pattern, where_str.strip())
+    def _parse_where_clause(self, where_str: str) -> WhereNode:
         
-        if not match:
-            raise ValueError(f"Invalid WHERE clause: {where_str}")
+        # Compiled predicates are memoized, so repeated queries skip parsing entirely
+        return _compile_where(where_str)
+    
+    def execute(self, sql: str) -> Any:
         
-        column = match.group(1)
-        operator = match.group(2)
-        value_str = match.group(3).strip().strip('"\'')
+        sql = sql.strip()
         
+        # Tokenize the first two words once and route on the keyword
+        words = sql.split(None, 2)
+        handler = self._handlers.get(words[0].upper()) if words else None
         
-        if value_str.isdigit():
-            value = int(value_str)
-        elif self._is_float(value_str):
-            value = float(value_str)
-        elif value_str.lower() == 'true':
-            value = True
-        elif value_str.lower() == 'false':
-            value = False
-        else:
-            value = value_str
-        
-        # Build lambda function because it is Compact and fits functional programming style of filters
-        if operator == '=':
-            return lambda row: row.get(column) == value
-        elif operator == '>':
-            return lambda row: row.get(column) > value
-        elif operator == '<':
-            return lambda row: row.get(column) < value
-        elif operator == '>=':
-            return lambda row: row.get(column) >= value
-        elif operator == '<=':
-            return lambda row: row.get(column) <= value
-        elif operator == '!=':
-            return lambda row: row.get(column) != value
-        else:
-            raise ValueError(f"Unsupported operator: {operator}")
+        if handler is None:
+            raise ValueError(f"Unsupported command: {sql}")
+        
+        return handler(sql, words)
     
-    def execute(self, sql: str) -> Any:
+    def _execute_create(self, sql: str, words: list) -> str:
         
-        sql = sql.strip()
+        kind = words[1].upper() if len(words) > 1 else ''
+        
+        if kind == 'INDEX':
+            params = self.parse_create_index(sql)
+            self.executor.create_index(params['table'], params['column'])
+            return f"Index on '{params['table']}.{params['column']}' created successfully"
         
-        # Route to appropriate parser
-        if sql.upper().startswith('CREATE TABLE'):
+        if kind == 'TABLE':
             params = self.parse_create_table(sql)
             self.executor.create_table(
                 params['table'], 
@@ -253,64 +285,72 @@ class REPL:
             )
             return f"Table '{params['table']}' created successfully"
         
-        elif sql.upper().startswith('INSERT INTO'):
-            params = self.parse_insert(sql)
-            # Convert positional values to named row
-            table_schema = self.schema.get_table_schema(params['table'])
-            columns = list(table_schema['columns'].keys())
-            row = dict(zip(columns, params['values']))
-            self.executor.insert_row(params['table'], row)
-            return "1 row inserted"
-        
-        elif sql.upper().startswith('SELECT'):
-            params = self.parse_select(sql)
-            rows = self.executor.select_rows(
-                params['table'],
-                where=params['where'],
-                columns=params['columns']
-            )
-            return rows
-        
-        elif sql.upper().startswith('DELETE'):
-            params = self.parse_delete(sql)
-            count = self.executor.delete_rows(
-                params['table'],
-                params['where']
-            )
-            return f"{count} row(s) deleted"
-        
-        elif sql.upper().startswith('UPDATE'):
-            params = self.parse_update(sql)
-            count = self.executor.update_rows(
-                params['table'],
-                params['where'],
-                params['updates']
-            )
-            return f"{count} row(s) updated"
-        
-        elif sql.upper().startswith('JOIN'):
-            params = self.parse_join(sql)
-            rows = self.executor.nested_loop_join(
-                params['left_table'],
-                params['right_table'],
-                params['on_column']
-            )
-            return rows
-        
-        elif sql.upper().startswith('DROP TABLE'):
-            table_name = sql.split()[2]
-            self.executor.drop_table(table_name)
-            return f"Table '{table_name}' dropped"
+        raise ValueError(f"Unsupported command: {sql}")
+    
+    def _execute_insert(self, sql: str, words: list) -> str:
+        
+        params = self.parse_insert(sql)
+        # Convert positional values to named row; the column tuple is cached per table
+        columns = self.schema.get_column_names(params['table'])
+        values = params['values']
+        if len(values) != len(columns):
+            raise ValueError(f"Expected {len(columns)} values, got {len(values)}")
+        row = dict(zip(columns, values))
+        self.executor.insert_row(params['table'], row)
+        return "1 row inserted"
+    
+    def _execute_select(self, sql: str, words: list) -> list:
+        
+        params = self.parse_select(sql)
+        return self.executor.select_rows(
+            params['table'],
+            where=params['where'],
+            columns=params['columns']
+        )
+    
+    def _execute_delete(self, sql: str, words: list) -> str:
+        
+        params = self.parse_delete(sql)
+        count = self.executor.delete_rows(
+            params['table'],
+            params['where']
+        )
+        return f"{count} row(s) deleted"
+    
+    def _execute_update(self, sql: str, words: list) -> str:
+        
+        params = self.parse_update(sql)
+        count = self.executor.update_rows(
+            params['table'],
+            params['where'],
+            params['updates']
+        )
+        return f"{count} row(s) updated"
+    
+    def _execute_join(self, sql: str, words: list) -> list:
+        
+        params = self.parse_join(sql)
+        return self.executor.hash_join(
+            params['left_table'],
+            params['right_table'],
+            params['on_column']
+        )
+    
+    def _execute_drop(self, sql: str, words: list) -> str:
         
-        else:
+        if len(words) < 3 or words[1].upper() != 'TABLE':
             raise ValueError(f"Unsupported command: {sql}")
+        
+        table_name = words[2].split()[0]
+        self.executor.drop_table(table_name)
+        return f"Table '{table_name}' dropped"
     
     def run(self) -> None:
         
         print("=" * 60)
         print("Custom RDBMS - Interactive Shell")
         print("=" * 60)
-        print("Commands: CREATE TABLE, INSERT, SELECT, DELETE, UPDATE, JOIN")
+        print("Commands: CREATE TABLE, CREATE INDEX, INSERT, SELECT, DELETE, UPDATE, JOIN")
         print("Type 'exit' to quit\n")
         
         while True:
@@ -327,24 +367,56 @@ class REPL:
                 
                 # Execute command
                 result = self.execute(sql)
-                
-                # Print result
-                if isinstance(result, list):
-                    if result:
-                        # Print as formatted table
-                        self._print_table(result)
-                    else:
-                        print("0 rows returned")
-                else:
-                    print(result)
-                
-                print()  
+                self._print_result(result)
                 
             except KeyboardInterrupt:
                 print("\nGoodbye!")
                 break
             except Exception as e:
                 print(f"Error: {e}\n")
+        
+        # Table files are written in the background; wait for them before returning
+        self.storage.flush()
+    
+    def run_script(self, path: str) -> None:
+        
+        # Runs one statement per line inside a single storage batch, so every table
+        # file is written once at the end instead of once per statement
+        with open(path, 'r') as f:
+            lines = f.readlines()
+        
+        self.storage.begin_batch()
+        try:
+            for line_number, line in enumerate(lines, 1):
+                sql = line.strip().rstrip(';')
+                
+                # Skip blank lines and comments
+                if not sql or sql.startswith('--'):
+                    continue
+                
+                try:
+                    result = self.execute(sql)
+                except Exception as e:
+                    print(f"Error on line {line_number}: {e}")
+                    break
+                
+                self._print_result(result)
+        finally:
+            self.storage.end_batch()
+            self.storage.flush()
+    
+    def _print_result(self, result: Any) -> None:
+        
+        if isinstance(result, list):
+            if result:
+                # Print as formatted table
+                self._print_table(result)
+            else:
+                print("0 rows returned")
+        else:
+            print(result)
+        
+        print()
     
     def _print_table(self, rows: list) -> None:
         
@@ -379,7 +451,12 @@ class REPL:
 def main():
     
     repl = REPL()
-    repl.run()
+    
+    # python repl.py script.sql runs a script; without arguments the shell starts
+    if len(sys.argv) > 1:
+        repl.run_script(sys.argv[1])
+    else:
+        repl.run()
 
 
 if __name__ == '__main__':
@@ -4,12 +4,33 @@ This is a minimal web interface demonstrating the CRUD operations over HTTP
 I mainly used flask for its simplicity and ease of setup.
 """
 
-from flask import Flask, request, render_template_string, jsonify, redirect, url_for
-import sys
+from flask import Flask, Response, request, redirect
+from markupsafe import Markup, escape
+import atexit
+import gzip
+import json
+import logging
 import os
+import queue
+import sys
+import threading
+import uuid
+import zlib
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
+from urllib.parse import urlencode
 
+try:
+    # orjson encodes JSON several times faster than the stdlib encoder behind jsonify; it is optional
+    import orjson
+except ImportError:
+    orjson = None
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+try:
+    # waitress is an optional production WSGI server used when RDBMS_ENV=prod
+    from waitress import serve
+except ImportError:
+    serve = None
 
 from core.storage_engine import StorageEngine
 from core.schema_manager import SchemaManager
@@ -17,118 +38,61 @@ from core.execution_engine import ExecutionEngine
 
 app = Flask(__name__)
 
+# The insert form is three short fields; larger bodies are rejected with 413 before
+# Werkzeug parses them
+app.config['MAX_CONTENT_LENGTH'] = 4 * 1024
+
+# Serve /data and /data/ alike instead of answering one with a redirect. Rules read this
+# when they are added, so it is set before any route is registered.
+app.url_map.strict_slashes = False
+
+logger = logging.getLogger(__name__)
+
 # initialization of core components
 storage = StorageEngine()
 schema = SchemaManager()
 executor = ExecutionEngine(storage, schema)
 
+# The dev server handles each request on its own thread, but the engine's caches and
+# indexes aren't thread-safe. Engine calls hold this lock; rendering and JSON encoding
+# happen outside it, and table files are written by the storage writer thread.
+_db_lock = threading.RLock()
+
+# Table versions restart at zero with the process, so ETags also carry a per-process id
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+# (users table version, rows) shared by the handlers that list every user
+_users_cache = None
+
+# (users table version, pre-rendered <tr> rows) for the index page
+_user_rows_cache = None
+
+# Encoded /data body for the last users table version it was requested at
+_data_cache = None
+
+# Encoded index page without a message, for the last users table version
+_index_cache = None
+
+
+class _EncodedBody:
+    
+    # A response body for one users table version. The gzip form is built by the first
+    # request that accepts it and reused until the version changes.
+    __slots__ = ('version', 'body', 'gzipped')
+    
+    def __init__(self, version, body=None, gzipped=None):
+        self.version = version
+        self.body = body
+        self.gzipped = gzipped
+
 
-# HTML Template with inline CSS for simplicity
+# HTML Template; the stylesheet is served from web/static so browsers can cache it
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Custom RDBMS Web Interface</title>
-    <style>
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            max-width: 1000px;
-            margin: 50px auto;
-            padding: 20px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: #333;
-        }
-        .container {
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }
-        h1 {
-            color: #667eea;
-            border-bottom: 3px solid #667eea;
-            padding-bottom: 10px;
-        }
-        h2 {
-            color: #764ba2;
-            margin-top: 30px;
-        }
-        form {
-            background: #f9f9f9;
-            padding: 20px;
-            border-radius: 8px;
-            margin: 20px 0;
-        }
-        input[type="text"], input[type="email"], input[type="number"] {
-            width: 100%;
-            padding: 10px;
-            margin: 8px 0;
-            border: 2px solid #ddd;
-            border-radius: 4px;
-            box-sizing: border-box;
-            font-size: 14px;
-        }
-        input[type="text"]:focus, input[type="email"]:focus, input[type="number"]:focus {
-            border-color: #667eea;
-            outline: none;
-        }
-        button {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 12px 30px;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: bold;
-            margin-top: 10px;
-        }
-        button:hover {
-            opacity: 0.9;
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: white;
-        }
-        th {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 12px;
-            text-align: left;
-        }
-        td {
-            padding: 10px;
-            border-bottom: 1px solid #ddd;
-        }
-        tr:hover {
-            background: #f5f5f5;
-        }
-        .message {
-            padding: 15px;
-            margin: 20px 0;
-            border-radius: 4px;
-            background: #d4edda;
-            border: 1px solid #c3e6cb;
-            color: #155724;
-        }
-        .error {
-            background: #f8d7da;
-            border: 1px solid #f5c6cb;
-            color: #721c24;
-        }
-        .badge {
-            display: inline-block;
-            padding: 4px 8px;
-            background: #667eea;
-            color: white;
-            border-radius: 12px;
-            font-size: 12px;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ stylesheet_url }}">
 </head>
 <body>
     <div class="container">
@@ -136,8 +100,12 @@ HTML_TEMPLATE = """
         <p>Built from scratch with Python - No SQLite, No SQLAlchemy</p>
         <span class="badge">Pesapal Junior Dev Challenge '26</span>
         
-        {% if message %}
-        <div class="message {% if error %}error{% endif %}">
+        {% if error %}
+        <div class="message error">
+            {{ error }}
+        </div>
+        {% elif message %}
+        <div class="message">
             {{ message }}
         </div>
         {% endif %}
@@ -160,14 +128,8 @@ HTML_TEMPLATE = """
                 </tr>
             </thead>
             <tbody>
-                {% if users %}
-                    {% for user in users %}
-                    <tr>
-                        <td>{{ user.id }}</td>
-                        <td>{{ user.name }}</td>
-                        <td>{{ user.email }}</td>
-                    </tr>
-                    {% endfor %}
+                {% if user_rows %}
+                    {{ user_rows }}
                 {% else %}
                     <tr>
                         <td colspan="3" style="text-align: center; color: #999;">
@@ -186,82 +148,324 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# The stylesheet URL carries the file's modification time, so a changed file gets a new
+# URL and the old one can be cached forever
+_STYLESHEET_VERSION = int(os.stat(os.path.join(app.static_folder, 'app.css')).st_mtime)
+_STYLESHEET_URL = f"{app.static_url_path}/app.css?v={_STYLESHEET_VERSION}"
+
+# Compiled once at import so requests only render it; the app's Jinja environment
+# autoescapes templates built from strings, as render_template_string did
+_INDEX_TEMPLATE = app.jinja_env.from_string(
+    HTML_TEMPLATE, globals={'stylesheet_url': _STYLESHEET_URL}
+)
+
+# The page for an empty table with no message never changes, so it is compressed at most once
+_EMPTY_INDEX_PAGE = _EncodedBody(
+    None, _INDEX_TEMPLATE.render(user_rows='', message='', error='').encode()
+)
+
 
 def initialize_demo_table():
-    try:
-        # 1. Check if table exists
-        schema.get_table_schema('users')
+    # 1. Check if table exists
+    if schema.table_exists('users'):
         # 2. CRITICAL: If it exists, load the existing data into the Index!
         executor.load_table_index('users')
-        print("Existing 'users' table found and Index populated")
-    except ValueError:
+        logger.info("Existing 'users' table found and Index populated")
+    else:
         # 3. If it doesn't exist, create it
         executor.create_table(
             'users',
             columns={'id': 'Int', 'name': 'String', 'email': 'String'},
             primary_key='id'
         )
-        print("New 'users' table created")
+        logger.info("New 'users' table created")
+
+
+def _all_users():
+    
+    # Callers hold _db_lock. The list is shared between requests and must not be modified.
+    global _users_cache
+    version = storage.table_version('users')
+    if _users_cache is None or _users_cache[0] != version:
+        _users_cache = (version, executor.select_rows('users'))
+    return _users_cache[1]
+
+
+def _user_rows():
+    
+    # Callers hold _db_lock. The table body is built with one str.join per table version
+    # and handed to the template as Markup, so a page render never loops over the rows.
+    # Fields are escaped here with the same escaper Jinja's autoescape uses.
+    global _user_rows_cache
+    users = _all_users()
+    version = _users_cache[0]
+    if _user_rows_cache is None or _user_rows_cache[0] != version:
+        _user_rows_cache = (version, Markup(''.join([
+            f"<tr><td>{escape(user['id'])}</td><td>{escape(user['name'])}</td>"
+            f"<td>{escape(user['email'])}</td></tr>\n"
+            for user in users
+        ])))
+    return _user_rows_cache[1]
+
+
+def _dumps(obj):
+    
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _json(obj, status=200):
+    
+    return Response(_dumps(obj), status=status, mimetype='application/json')
+
+
+@app.after_request
+def cache_static_files(response):
+    
+    # Static URLs are versioned, so browsers never need to revalidate them. Errors such
+    # as a 404 for a missing file must not be cached for a year.
+    if request.path.startswith(app.static_url_path + '/') and response.status_code in (200, 304):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+# Responses smaller than this aren't worth the gzip header and CPU time
+COMPRESS_MIN_SIZE = 500
+COMPRESS_MIMETYPES = {'text/html', 'application/json'}
+
+
+@app.after_request
+def compress_response(response):
+    
+    # File responses (the stylesheet) are streamed from disk and cached by the browser,
+    # so only generated pages and JSON are compressed
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype not in COMPRESS_MIMETYPES
+        or 'Content-Encoding' in response.headers
+        or not request.accept_encodings['gzip']
+    ):
+        return response
+    
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=6))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _encoded_response(entry, mimetype):
+    
+    # Responses built from an _EncodedBody set Content-Encoding themselves, so
+    # compress_response leaves them alone. Entries from a streamed body hold only
+    # the gzip form and are only used for clients that accept it.
+    if request.accept_encodings['gzip'] and (
+        entry.body is None or len(entry.body) >= COMPRESS_MIN_SIZE
+    ):
+        if entry.gzipped is None:
+            entry.gzipped = gzip.compress(entry.body, compresslevel=6)
+        response = Response(entry.gzipped, mimetype=mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(entry.body, mimetype=mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _redirect_to_index(**params):
+    
+    # index is '/', so the URL is built directly instead of through url_for. 303 makes the
+    # browser follow with a GET, so refreshing the page doesn't resubmit the form.
+    return redirect(f"/?{urlencode(params)}", code=303)
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    
+    return _redirect_to_index(error='Request too large')
 
 
 @app.route('/', methods=['GET'])
 def index():
+    global _index_cache
     message = request.args.get('message', '')
     error = request.args.get('error', '')
     
     #fetch all users
     try:
-        users = executor.select_rows('users')
+        with _db_lock:
+            user_rows = _user_rows()
+            version = _user_rows_cache[0]
     except Exception as e:
-        users = []
+        user_rows = ''
         error = str(e)
     
-    return render_template_string(
-        HTML_TEMPLATE,
-        users=users,
-        message=message,
-        error=error
+    if not user_rows and not message and not error:
+        return _encoded_response(_EMPTY_INDEX_PAGE, 'text/html')
+    
+    # Pages without a message depend only on the table, so they are rendered and
+    # compressed once per version
+    if not message and not error:
+        cached = _index_cache
+        if cached is None or cached.version != version:
+            cached = _EncodedBody(version, _INDEX_TEMPLATE.render(
+                user_rows=user_rows, message='', error=''
+            ).encode())
+            _index_cache = cached
+        return _encoded_response(cached, 'text/html')
+    
+    return Response(
+        _INDEX_TEMPLATE.render(user_rows=user_rows, message=message, error=error),
+        mimetype='text/html'
     )
 
 
 @app.route('/insert', methods=['POST'])
 def insert():
+    # Extract form data; missing or malformed fields are rejected before the engine is involved
+    form = request.form
+    id_str = form.get('id', '').strip()
+    name = form.get('name', '')
+    email = form.get('email', '')
+    
+    if not (id_str and name and email):
+        return _redirect_to_index(error='All fields are required')
+    if not id_str.removeprefix('-').isdecimal():
+        return _redirect_to_index(error='User ID must be an integer')
+    
     try:
-        # Extract form data
-        user_id = int(request.form['id'])
-        name = request.form['name']
-        email = request.form['email']
-        
         # Insert into database
-        executor.insert_row('users', {
-            'id': user_id,
-            'name': name,
-            'email': email
-        })
+        with _db_lock:
+            executor.insert_row('users', {
+                'id': int(id_str),
+                'name': name,
+                'email': email
+            })
+    except (ValueError, IOError) as e:
+        # Schema and primary key violations, and a failed earlier write to the table;
+        # redirect with the error message in the URL
+        return _redirect_to_index(error=str(e))
 
-        # USE REDIRECT INSTEAD OF SCRIPT TAGS
-        return redirect(url_for('index', message=f'User "{name}" added successfully!'))
-        
-    except Exception as e:
-        # Redirect with the error message in the URL
-        return redirect(url_for('index', error=str(e)))
+    # USE REDIRECT INSTEAD OF SCRIPT TAGS
+    return _redirect_to_index(message=f'User "{name}" added successfully!')
+
+
+# Tables with at least this many rows are sent as a stream of encoded chunks instead of
+# one body, so the full JSON document is never held in memory
+STREAM_MIN_ROWS = 10000
+STREAM_CHUNK_ROWS = 1000
+
+
+def _stream_rows(rows):
+    
+    yield b'{"success":true,"data":['
+    for start in range(0, len(rows), STREAM_CHUNK_ROWS):
+        if start:
+            yield b','
+        # Encoding a slice as a list and dropping the brackets keeps the work in C
+        yield _dumps(rows[start:start + STREAM_CHUNK_ROWS])[1:-1]
+    yield b'],"count":%d}' % len(rows)
+
+
+def _gzip_data_stream(chunks, version):
+    
+    # Compresses the /data stream as it is sent. Only the compressed body is kept, once
+    # the whole of it has gone out, so later gzip requests at this version skip encoding.
+    global _data_cache
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes the gzip format
+    parts = []
+    for chunk in chunks:
+        part = compressor.compress(chunk)
+        if part:
+            parts.append(part)
+            yield part
+    part = compressor.flush()
+    parts.append(part)
+    yield part
+    _data_cache = _EncodedBody(version, gzipped=b''.join(parts))
 
 
 @app.route('/data', methods=['GET'])
 def get_data():
     
+    global _data_cache
+    
     try:
-        users = executor.select_rows('users')
-        return jsonify({
-            'success': True,
-            'data': users,
-            'count': len(users)
-        })
+        accepts_gzip = request.accept_encodings['gzip']
+        
+        # The ETag is the table version, so polling clients get a 304 until a row changes
+        with _db_lock:
+            version = storage.table_version('users')
+            etag = f"{_BOOT_ID}-{version}"
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+                response.set_etag(etag, weak=True)
+                # Same variants as the 200, so caches keep gzip and plain bodies apart
+                response.vary.add('Accept-Encoding')
+                return response
+            
+            cached = _data_cache
+            if (
+                cached is None
+                or cached.version != version
+                or (cached.body is None and not accepts_gzip)
+            ):
+                cached = None
+                users = _all_users()
+        
+        if cached is None and len(users) >= STREAM_MIN_ROWS:
+            if accepts_gzip:
+                response = Response(
+                    _gzip_data_stream(_stream_rows(users), version), mimetype='application/json'
+                )
+                response.headers['Content-Encoding'] = 'gzip'
+            else:
+                response = Response(_stream_rows(users), mimetype='application/json')
+            response.vary.add('Accept-Encoding')
+            response.set_etag(etag, weak=True)
+            return response
+        
+        if cached is None:
+            cached = _EncodedBody(version, _dumps({
+                'success': True,
+                'data': users,
+                'count': len(users)
+            }))
+            _data_cache = cached
+        
+        response = _encoded_response(cached, 'application/json')
+        response.set_etag(etag, weak=True)
+        return response
     except Exception as e:
-        return jsonify({
+        return _json({
             'success': False,
             'error': str(e)
-        }), 500
+        }, 500)
+
+
+@lru_cache(maxsize=1024)
+def _search_response(version, user_id):
+    
+    # Encoded body and status for one id at one users-table version. Any write moves the
+    # version, so entries for older versions are never hit again and age out of the LRU.
+    with _db_lock:
+        user = executor.select_by_primary_key('users', user_id)
+    
+    if user:
+        return _dumps({
+            'success': True,
+            'data': user
+        }), 200
+    return _dumps({
+        'success': False,
+        'error': 'User not found'
+    }), 404
 
 
 @app.route('/search', methods=['GET'])
@@ -270,43 +474,86 @@ def search():
     Search users by ID which demonstrates an indexed lookup
     
     Example: GET /search?id=1
+    Several ids are looked up together: GET /search?id=1&id=2
     """
     try:
-        user_id = int(request.args.get('id'))
-        user = executor.select_by_primary_key('users', user_id)
+        values = request.args.getlist('id')
+        if not values:
+            raise ValueError("Missing 'id' parameter")
+        user_ids = [int(value) for value in values]
         
-        if user:
-            return jsonify({
-                'success': True,
-                'data': user
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'User not found'
-            }), 404
+        if len(user_ids) == 1:
+            with _db_lock:
+                version = storage.table_version('users')
+            body, status = _search_response(version, user_ids[0])
+            return Response(body, status=status, mimetype='application/json')
+        
+        with _db_lock:
+            users = executor.select_by_primary_keys('users', user_ids)
+        
+        found = [user for user in users if user is not None]
+        return _json({
+            'success': True,
+            'data': found,
+            'count': len(found)
+        })
             
     except Exception as e:
-        return jsonify({
+        return _json({
             'success': False,
             'error': str(e)
-        }), 400
+        }, 400)
+
+
+def configure_logging(level=logging.INFO):
+    
+    # Handlers on the request path only put records on a queue; a listener thread does
+    # the writes to stdout, which can block when it is a pipe or the journal. Werkzeug's
+    # request log goes through the root logger too, so it is queued as well.
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    )
+    listener = QueueListener(log_queue, stream_handler)
+    
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    listener.start()
+    atexit.register(listener.stop)
 
 
 def main():
    
-    print("=" * 60)
-    print("Custom RDBMS - Web Interface")
-    print("=" * 60)
-    
+    configure_logging()
     
     initialize_demo_table()
     
-    print("\n🚀 Server starting...")
-    print("📍 Open your browser to: http://127.0.0.1:5000")
-    print("Press Ctrl+C to stop\n")
+    logger.info("Custom RDBMS web interface starting on http://127.0.0.1:5000 (Ctrl+C to stop)")
+    
+    if os.environ.get('RDBMS_ENV') == 'prod':
+        run_production()
+    else:
+        app.run(debug=True, host='127.0.0.1', port=5000, threaded=True)
+
+
+def run_production():
     
-    app.run(debug=True, host='127.0.0.1', port=5000)
+    # A single process on purpose: the primary-key index and row cache live in memory,
+    # so separate worker processes would each accept the same id and write the table
+    # file independently. Requests are spread over threads instead, without the
+    # debugger or reloader.
+    if serve is not None:
+        # waitress keeps HTTP/1.1 connections open between requests, so polling clients
+        # skip a TCP handshake per request; its default closes idle ones after 120 s
+        serve(app, host='127.0.0.1', port=5000)
+    else:
+        logger.warning(
+            "waitress is not installed; using the built-in server, which closes the "
+            "connection after every response"
+        )
+        app.run(debug=False, host='127.0.0.1', port=5000, threaded=True)
 
 
 if __name__ == '__main__':